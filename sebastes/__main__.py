@@ -2,8 +2,6 @@ import argparse
 import os
 
 from sebastes.logger import log
-from sebastes.processor import FileProcessor
-from sebastes.scanner import Scanner
 
 
 def dir_path(value: str) -> str:
@@ -19,73 +17,112 @@ def dir_path(value: str) -> str:
         return value
 
 
-parser = argparse.ArgumentParser(description='Pydantic library code generator for Redfish targets')
-parser.add_argument(
-    '-a',
-    action='store',
-    dest='hostname',
-    type=str,
-    required=True,
-    help='DNS name or IP address of Redfish target'
-)
-parser.add_argument(
-    '-u',
-    action='store',
-    dest='username',
-    type=str,
-    required=True,
-    help='Target username'
-)
-parser.add_argument(
-    '-p',
-    action='store',
-    dest='password',
-    type=str,
-    required=True,
-    help='Target password'
-)
-parser.add_argument(
-    '-o',
-    action='store',
-    dest='output',
-    type=dir_path,
-    required=True,
-    help='Output directory'
-)
-parser.add_argument(
-    '-e',
-    action='store',
-    nargs='?',
-    dest='entry_point',
-    type=str,
-    default='/redfish/v1/',
-    help="Redfish entry point | optional default is '/redfish/v1/'"
-)
-parser.add_argument(
-    '-m',
-    action='store',
-    nargs='?',
-    dest='max_models',
-    type=int,
-    default=500,
-    help='Max Models to scan | optional default is 500'
-)
-parser.add_argument(
-    '-c',
-    action='store',
-    nargs='?',
-    dest='max_collection',
-    type=int,
-    default=50,
-    help='Max Collection elements to sample from | optional default is 50')
-
-args = parser.parse_args()
+def positive_int(value: str) -> int:
+    """
+    Validates that passed argument is a positive integer
+    :param value: argument value
+    :return: parsed integer
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid int value: {value!r}')
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f'value must be a positive integer: {value}')
+    return number
 
 
 def main() -> None:
     """
     Le main function
     """
+    parser = argparse.ArgumentParser(description='Pydantic library code generator for Redfish targets')
+    parser.add_argument(
+        '-a',
+        action='store',
+        dest='hostname',
+        type=str,
+        required=True,
+        help='DNS name or IP address of Redfish target'
+    )
+    parser.add_argument(
+        '-u',
+        action='store',
+        dest='username',
+        type=str,
+        required=True,
+        help='Target username'
+    )
+    parser.add_argument(
+        '-p',
+        action='store',
+        dest='password',
+        type=str,
+        required=True,
+        help='Target password'
+    )
+    parser.add_argument(
+        '-o',
+        action='store',
+        dest='output',
+        type=dir_path,
+        required=True,
+        help='Output directory'
+    )
+    parser.add_argument(
+        '-e',
+        action='store',
+        nargs='?',
+        dest='entry_point',
+        type=str,
+        default='/redfish/v1/',
+        help="Redfish entry point | optional default is '/redfish/v1/'"
+    )
+    parser.add_argument(
+        '-m',
+        action='store',
+        nargs='?',
+        dest='max_models',
+        type=int,
+        default=500,
+        help='Max Models to scan | optional default is 500'
+    )
+    parser.add_argument(
+        '-c',
+        action='store',
+        nargs='?',
+        dest='max_collection',
+        type=int,
+        default=50,
+        help='Max Collection elements to sample from | optional default is 50')
+    parser.add_argument(
+        '-w',
+        action='store',
+        nargs='?',
+        dest='max_workers',
+        type=positive_int,
+        default=4,
+        help='Max parallel requests to target during scan | optional default is 4')
+    parser.add_argument(
+        '-j',
+        action='store',
+        nargs='?',
+        dest='max_processes',
+        type=positive_int,
+        default=None,
+        help='Max parallel processes for code generation | optional default is CPU count')
+    parser.add_argument(
+        '--no-format',
+        action='store_true',
+        dest='no_format',
+        help='Skip generated code formatting | optional')
+
+    args = parser.parse_args()
+
+    # Heavy modules are imported here, so '--help' and argument errors don't pay for them
+    from sebastes.processor import FileProcessor
+    from sebastes.scanner import Scanner
+
     addr = args.hostname
     username = args.username
     password = args.password
@@ -93,6 +130,9 @@ def main() -> None:
     entry_point = args.entry_point
     max_models = args.max_models
     max_collection = args.max_collection
+    max_workers = args.max_workers
+    max_processes = args.max_processes
+    format_code = not args.no_format
 
     log.info(f'Scanning Redfish API for {addr}')
     scanner = Scanner(
@@ -100,7 +140,8 @@ def main() -> None:
         username=username,
         password=password,
         max_models=max_models,
-        max_collection=max_collection
+        max_collection=max_collection,
+        max_workers=max_workers
     )
     scanner.scan_models(entry_point=entry_point)
 
@@ -113,7 +154,7 @@ def main() -> None:
     for index, _model in enumerate(scanner.redfish_datas, start=1):
         log.info(f'{index}. {_model}')
 
-    processor = FileProcessor(scanner.redfish_datas, output)
+    processor = FileProcessor(scanner.redfish_datas, output, format_code=format_code, max_workers=max_processes)
     processor.generate_lib()
 
     if len(processor.problems) != 0:
@@ -1,8 +1,10 @@
 import logging
 import sys
+import time
 import typing
 
 SUCCESS = 25
+PROGRESS_INTERVAL_NS = 50_000_000
 
 
 class CustomFormatter(logging.Formatter):
@@ -34,15 +36,24 @@ class CustomFormatter(logging.Formatter):
 
     def __init__(self) -> None:
         super().__init__(fmt=self.custom_format_short, datefmt='%Y-%m-%d %H:%M:%S')
+        # No colors for redirected output
+        self._color = sys.stdout.isatty()
+        self._wraps = {
+            level: (color, self.reset) if self._color else (self.colorless, self.colorless)
+            for level, color in self.FORMATS.items()
+        }
+        self._error_wrap = (self.red, self.reset) if self._color else (self.colorless, self.colorless)
 
     def format(self, record: logging.LogRecord) -> str:
         """
         Formats passed record.
         """
         if record.exc_info is not None:
-            return f'\n{self.red}{super(CustomFormatter, self).format(record)}{self.reset}\n'
+            prefix, suffix = self._error_wrap
+            return ''.join(('\n', prefix, super(CustomFormatter, self).format(record), suffix, '\n'))
         else:
-            return f'{self.FORMATS.get(record.levelno)}{super(CustomFormatter, self).format(record)}{self.reset}'
+            prefix, suffix = self._wraps.get(record.levelno, (self.colorless, self.colorless))
+            return ''.join((prefix, super(CustomFormatter, self).format(record), suffix))
 
 
 class CustomLogger(logging.Logger):
@@ -57,6 +68,8 @@ class CustomLogger(logging.Logger):
         self._primary_handler.setLevel(level=level)
         self._primary_handler.setFormatter(CustomFormatter())
         self.addHandler(self._primary_handler)
+        self._last_progress_time = 0
+        self._last_progress_percent = -1
         logging.addLevelName(SUCCESS, 'SUCCESS')
 
     def progress_bar(self,  # type: ignore
@@ -84,6 +97,16 @@ class CustomLogger(logging.Logger):
         progress = 100 * (iteration / float(total))
         if progress > 100:
             progress = 100
+
+        # Output is throttled, bar is redrawn only on percent change, after some delay or on last iteration
+        now = time.monotonic_ns()
+        if iteration < total \
+                and int(progress) == self._last_progress_percent \
+                and now - self._last_progress_time < PROGRESS_INTERVAL_NS:
+            return
+        self._last_progress_time = now
+        self._last_progress_percent = int(progress)
+
         if show_percent:
             percent = ("{0:." + str(decimals) + "f}%").format(progress)
         else:
@@ -91,7 +114,7 @@ class CustomLogger(logging.Logger):
         filled_length = int(length * iteration // total)
         if filled_length > length:
             filled_length = length
-        bar = fill * filled_length + '-' * (length - filled_length)
+        bar = (fill * filled_length).ljust(length, '-')
         self._primary_handler.terminator = '\n' if iteration >= total else '\r'
         self._log(level, f'\r{prefix} |{bar}| {percent} {suffix}', args, **kwargs)
         self._primary_handler.flush()
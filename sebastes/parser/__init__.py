@@ -1,5 +1,5 @@
 __all__ = [
-    'Parser', 'Result'
+    'Parser', 'Result', 'merge_imports'
 ]
 
-from .parser import Parser, Result
+from .parser import Parser, Result, merge_imports
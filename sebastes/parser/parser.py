@@ -1,8 +1,13 @@
 import dataclasses
 import enum
 import functools
-import itertools
+import hashlib
+import importlib.metadata
+import os
 import pathlib
+import pickle
+import re
+import tempfile
 import typing
 
 from datamodel_code_generator.format import PythonVersion
@@ -26,6 +31,8 @@ from datamodel_code_generator.parser.jsonschema import JsonSchemaParser
 
 from sebastes.scanner import RedfishData
 
+CACHE_DIR = pathlib.Path.home() / '.cache' / 'sebastes'
+
 
 @dataclasses.dataclass
 class Result:
@@ -37,6 +44,48 @@ class Result:
     imports: Imports
     model_names: typing.List[str]
 
+    def __getstate__(self) -> typing.Dict[str, typing.Any]:
+        # Imports can't be pickled directly, so it is passed as plain list of Import objects
+        state = self.__dict__.copy()
+        state['imports'] = _dump_imports(self.imports)
+        return state
+
+    def __setstate__(self, state: typing.Dict[str, typing.Any]) -> None:
+        imports = Imports()
+        imports.append(state['imports'])
+        self.__dict__.update(state, imports=imports)
+
+
+@functools.lru_cache()
+def _package_version(name: str) -> typing.Optional[str]:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _relative(current_module: str, reference: str) -> typing.Tuple[str, str]:
+    return relative(current_module, reference)
+
+
+def _dump_imports(imports: Imports) -> typing.List[Import]:
+    return [
+        Import(from_=from_, import_=import_, alias=imports.alias.get(from_, {}).get(import_))
+        for from_, targets in imports.items()
+        for import_ in targets
+    ]
+
+
+def merge_imports(*imports: Imports) -> Imports:
+    """
+    Combines passed imports into a new Imports object, passed objects stay intact
+    """
+    result = Imports()
+    for entry in imports:
+        result.append(_dump_imports(entry))
+    return result
+
 
 class DataModelCategory(enum.Enum):
     """
@@ -50,11 +99,11 @@ class DataModelCategory(enum.Enum):
     UNKNOWN = '???'
 
 
-category_fields: typing.Dict[DataModelCategory, typing.List[str]] = {
-    DataModelCategory.LINK: ['odata_id'],
-    DataModelCategory.ACTION: ['target'],
-    DataModelCategory.RESOURCE: ['odata_id', 'odata_type'],
-    DataModelCategory.COLLECTION: ['odata_id', 'odata_type', 'members_odata_count', 'members']
+category_fields: typing.Dict[DataModelCategory, typing.FrozenSet[str]] = {
+    DataModelCategory.LINK: frozenset(['odata_id']),
+    DataModelCategory.ACTION: frozenset(['target']),
+    DataModelCategory.RESOURCE: frozenset(['odata_id', 'odata_type']),
+    DataModelCategory.COLLECTION: frozenset(['odata_id', 'odata_type', 'members_odata_count', 'members'])
 }
 
 optional_fields: typing.Dict[DataModelCategory, typing.List[str]] = {
@@ -66,6 +115,10 @@ optional_fields: typing.Dict[DataModelCategory, typing.List[str]] = {
     ]
 }
 
+removable_fields: typing.Dict[DataModelCategory, typing.FrozenSet[str]] = {
+    category: fields.union(optional_fields[category]) for category, fields in category_fields.items()
+}
+
 
 class CustomDataModel(BaseModel):
     """
@@ -80,6 +133,9 @@ class CustomDataModel(BaseModel):
         ('__redfish__action_info', 'redfish_action_info'),
         ('__', '_')
     ]
+    # Single pass replacement, earlier words take precedence over later ones, i.e. '__' is the last resort
+    _replace_pattern = re.compile('|'.join(re.escape(old) for old, _ in _replace_words))
+    _replace_map = dict(_replace_words)
 
     def __init__(self,
                  *,
@@ -110,28 +166,33 @@ class CustomDataModel(BaseModel):
         """Replaces field names according to specific dictionary"""
         result: typing.List[DataModelField] = []
         for field in fields:
-            for old, new in self._replace_words:
-                field.name = field.name.replace(old, new)
+            field.name = self._replace_pattern.sub(lambda match: self._replace_map[match.group(0)], field.name)
             result.append(field)
         return result
 
-    def _fields_are_present(self, names: typing.List[str]) -> bool:
-        field_names = [field.name for field in self.fields]
-        for name in names:
-            if name not in field_names:
-                return False
-        return True
+    @functools.cached_property
+    def _field_names(self) -> typing.FrozenSet[str]:
+        return frozenset(field.name for field in self.fields)
 
-    @property
+    def _fields_are_present(self, names: typing.AbstractSet[str]) -> bool:
+        return self._field_names.issuperset(names)
+
+    def remove_fields(self, names: typing.AbstractSet[str]) -> None:
+        """Removes fields with passed names"""
+        self.fields = [field for field in self.fields if field.name not in names]
+        self.__dict__.pop('_field_names', None)
+        self.__dict__.pop('category', None)
+
+    @functools.cached_property
     def category(self) -> DataModelCategory:
         """
         Processed Redfish model category
         """
-        category = DataModelCategory.UNKNOWN
-        for _cat, fields in category_fields.items():
+        # Categories are ordered from the least to the most specific one, so the last match wins
+        for category, fields in reversed(category_fields.items()):
             if self._fields_are_present(fields):
-                category = _cat
-        return category
+                return category
+        return DataModelCategory.UNKNOWN
 
     def __repr__(self) -> str:
         return f'{self.category.value} - {self.name}'
@@ -142,15 +203,19 @@ class Parser:
     Redfish data convertor into pydantic models
     """
 
-    def __init__(self, redfish_data: RedfishData, child_data: typing.Optional[RedfishData]):
+    def __init__(self,
+                 redfish_data: RedfishData,
+                 child_data: typing.Optional[RedfishData],
+                 format_code: bool = True):
         self._redfish_data = redfish_data
         self._child_data = child_data
+        self._format_code = format_code
         self._base_class = 'pydantic.BaseModel'
 
     @property
     def model_names(self) -> typing.List[str]:
         """List of names of all models in Redfish data"""
-        return [m.name for m in self._get_data_models()]
+        return [m.name for m in self._data_models]
 
     @functools.cached_property
     def _parser(self) -> JsonSchemaParser:
@@ -167,6 +232,7 @@ class Parser:
         return parser
 
     @staticmethod
+    @functools.lru_cache()
     def _get_data_type(
             category: DataModelCategory,
             collection: typing.Optional[str] = None,
@@ -189,28 +255,27 @@ class Parser:
     def _get_code_formatter(self) -> CodeFormatter:
         return CodeFormatter(self._parser.target_python_version, None, self._parser.wrap_string_literal)
 
-    @functools.lru_cache()  # noqa: B019
-    def _get_data_models(self) -> typing.List[CustomDataModel]:
+    @functools.cached_property
+    def _data_models(self) -> typing.List[CustomDataModel]:
         models = self._parser.results
+        categories = self._group_by_category(models)
         models = self._update_collection_methods(models)
-        models = self._clean_up_models(models, category=DataModelCategory.LINK)
-        models = self._clean_up_models(models, category=DataModelCategory.ACTION)
-        models = self._update_classes(models, category=DataModelCategory.RESOURCE)
-        models = self._update_classes(models, category=DataModelCategory.COLLECTION)
+        models = self._clean_up_models(models, DataModelCategory.LINK, categories[DataModelCategory.LINK])
+        models = self._clean_up_models(models, DataModelCategory.ACTION, categories[DataModelCategory.ACTION])
+        models = self._update_classes(models, DataModelCategory.RESOURCE, categories[DataModelCategory.RESOURCE])
+        models = self._update_classes(models, DataModelCategory.COLLECTION, categories[DataModelCategory.COLLECTION])
         models = self._update_description(models)
         models = self._update_url(models)
         models = self._update_root_model_name(models)
         return models
 
-    def _get_cleaned_models(self) -> typing.List[CustomDataModel]:  # noqa: C901
-        models: typing.List[CustomDataModel] = []
-
-        _, sorted_models, _ = sort_data_models(self._get_data_models())
-        sorted_models = sorted(sorted_models.values(), key=lambda x: x.module_path, reverse=True)
-        grouped_models = itertools.groupby(sorted_models, key=lambda x: x.module_path)
-        for _, group in grouped_models:
-            models += list(group)
+    def _get_cleaned_models(  # noqa: C901
+            self
+    ) -> typing.Tuple[typing.List[CustomDataModel], typing.List[typing.Tuple[Import, ...]]]:
+        _, sorted_models, _ = sort_data_models(self._data_models)
+        models: typing.List[CustomDataModel] = sorted(sorted_models.values(), key=lambda x: x.module_path, reverse=True)
 
+        model_ids = {id(model) for model in models}
         for model in models:
             if isinstance(model, self._parser.data_model_root_type):
                 root_data_type = model.fields[0].data_type
@@ -220,7 +285,7 @@ class Parser:
                         root_data_type.reference
                         and not root_data_type.is_dict
                         and not root_data_type.is_list
-                        and root_data_type.reference.source in models
+                        and id(root_data_type.reference.source) in model_ids
                         and root_data_type.reference.name
                         == self._parser.model_resolver.get_class_name(model.reference.original_name, unique=False)
                 ):
@@ -228,6 +293,7 @@ class Parser:
                     for child in model.reference.children[:]:
                         child.replace_reference(root_data_type.reference)
                     models.remove(model)
+                    model_ids.remove(id(model))
                     continue
 
                 #  Custom root model can't be inherited on restriction of Pydantic
@@ -240,8 +306,10 @@ class Parser:
                         if not child.base_classes:
                             child.set_base_class()
 
+        # Model imports are built from all fields on each access, so they are collected once
+        models_imports = [model.imports for model in models]
         scoped_model_resolver = ModelResolver(
-            exclude_names={i.alias or i.import_ for m in models for i in m.imports},
+            exclude_names={i.alias or i.import_ for model_imports in models_imports for i in model_imports},
             duplicate_name_suffix='Model',
         )
 
@@ -254,7 +322,16 @@ class Parser:
                 else:
                     model.reference.name = generated_name
 
-        return models
+        return models, models_imports
+
+    @staticmethod
+    def _group_by_category(
+            models: typing.List[CustomDataModel]
+    ) -> typing.Dict[DataModelCategory, typing.List[CustomDataModel]]:
+        result: typing.Dict[DataModelCategory, typing.List[CustomDataModel]] = {c: [] for c in DataModelCategory}
+        for model in models:
+            result[model.category].append(model)
+        return result
 
     def _update_description(self, models: typing.List[CustomDataModel]) -> typing.List[CustomDataModel]:
         if self._redfish_data.description is not None:
@@ -284,20 +361,17 @@ class Parser:
 
     def _update_classes(self,
                         models: typing.List[CustomDataModel],
-                        category: DataModelCategory
+                        category: DataModelCategory,
+                        targets: typing.List[CustomDataModel]
                         ) -> typing.List[CustomDataModel]:
         result: typing.List[CustomDataModel] = []
-        targets = [m for m in models if m.category == category]
         if len(targets) != 0:
             data_type = self._get_data_type(category)
-            fields_to_remove = category_fields.get(category) + optional_fields.get(category)
+            fields_to_remove = removable_fields[category]
+            target_ids = {id(target) for target in targets}
             for model in models:
-                if model in targets:
-                    new_fields = []
-                    for field in model.fields:
-                        if field.name not in fields_to_remove:
-                            new_fields.append(field)
-                    model.fields = new_fields
+                if id(model) in target_ids:
+                    model.remove_fields(fields_to_remove)
                     model.base_classes = [data_type]
                     for i in data_type.imports:
                         model._additional_imports.append(i)
@@ -333,58 +407,104 @@ class Parser:
 
     def _clean_up_models(self,
                          models: typing.List[CustomDataModel],
-                         category: DataModelCategory
+                         category: DataModelCategory,
+                         targets: typing.List[CustomDataModel]
                          ) -> typing.List[CustomDataModel]:
         result: typing.List[CustomDataModel] = []
-        targets = [m for m in models if m.category == category]
         if len(targets) != 0:
-            names = [target.name for target in targets]
-            list_names = [f'List[{target.name}]' for target in targets]
-            dict_names = [f'Dict[{target.name}]' for target in targets]
-            opti_names = [f'Optional[{target.name}]' for target in targets]
+            target_ids = {id(target) for target in targets}
+            data_type = self._get_data_type(category)
+            list_data_type = self._get_data_type(category, collection='List')
+            dict_data_type = self._get_data_type(category, collection='Dict')
+            optional_data_type = self._get_data_type(category, is_optional=True)
+            type_hints: typing.Dict[str, DataType] = {}
+            for target in targets:
+                type_hints[target.name] = data_type
+                type_hints[f'List[{target.name}]'] = list_data_type
+                type_hints[f'Dict[{target.name}]'] = dict_data_type
+                type_hints[f'Optional[{target.name}]'] = optional_data_type
             for model in models:
-                if model not in targets:
+                if id(model) not in target_ids:
                     for field in model.fields:
-                        if field.type_hint in names:
-                            field.data_type = self._get_data_type(category)
-                        if field.type_hint in list_names:
-                            field.data_type = self._get_data_type(category, collection='List')
-                        if field.type_hint in dict_names:
-                            field.data_type = self._get_data_type(category, collection='Dict')
-                        if field.type_hint in opti_names:
-                            field.data_type = self._get_data_type(category, is_optional=True)
+                        new_data_type = type_hints.get(field.type_hint)
+                        if new_data_type is not None:
+                            field.data_type = new_data_type
                     result.append(model)
         else:
             result = models
         return result
 
+    @property
+    def _cache_file(self) -> pathlib.Path:
+        hasher = hashlib.blake2b(digest_size=16)
+        for value in (
+                self._redfish_data.schema,
+                self._redfish_data.full_name,
+                self._redfish_data.uri,
+                self._redfish_data.description,
+                self._child_data.full_name if self._child_data is not None else None,
+                self._format_code,
+                # Cached results are generated code, so they are invalidated by generator upgrades
+                _package_version('sebastes'),
+                _package_version('datamodel-code-generator')
+        ):
+            hasher.update(f'{value}\0'.encode())
+        return CACHE_DIR / f'{hasher.hexdigest()}.pkl'
+
     @property
     def results(self) -> Result:
         """
-        Returns parsing result object
+        Returns parsing result object.
+        If SEBASTES_CACHE=1 is set, results are cached on disk and reused for identical Redfish data.
         """
+        if os.environ.get('SEBASTES_CACHE') != '1':
+            return self._get_results()
+
+        cache_file = self._cache_file
+        if cache_file.is_file():
+            # Unreadable entry (e.g. pickled by other pydantic or Python) is a cache miss and gets overwritten
+            try:
+                with open(cache_file, 'rb') as file:
+                    return pickle.load(file)
+            except Exception:
+                pass
+
+        result = self._get_results()
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=CACHE_DIR, delete=False) as file:
+            try:
+                pickle.dump(result, file)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, cache_file)
+        return result
+
+    def _get_results(self) -> Result:
         result: typing.List[str] = []
         imports = Imports()
         scoped_model_resolver = ModelResolver()
 
-        models = self._get_cleaned_models()
+        models, models_imports = self._get_cleaned_models()
+        model_ids = {id(model) for model in models}
 
-        for model in models:
-            imports.append(model.imports)
+        for model, model_imports in zip(models, models_imports):
+            imports.append(model_imports)
             for data_type in model.all_data_types:
                 # To change from/import
 
-                if not data_type.reference or data_type.reference.source in models:
+                if not data_type.reference or id(data_type.reference.source) in model_ids:
                     # No need to import non-reference model.
                     # Or, Referenced model is in the same file. we don't need to import the model
                     continue
 
                 if isinstance(data_type, BaseClassDataType):
-                    from_ = ''.join(relative(model.module_name, data_type.full_name))
+                    from_ = ''.join(_relative(model.module_name, data_type.full_name))
                     import_ = data_type.reference.short_name
                     full_path = from_, import_
                 else:
-                    from_, import_ = full_path = relative(model.module_name, data_type.full_name)
+                    from_, import_ = full_path = _relative(model.module_name, data_type.full_name)
 
                 alias = scoped_model_resolver.add(full_path, import_).name
 
@@ -399,6 +519,7 @@ class Parser:
         result += [code]
 
         body = '\n'.join(result)
-        body = self._get_code_formatter().format_code(body)
+        if self._format_code:
+            body = self._get_code_formatter().format_code(body)
 
         return Result(body=body, imports=imports, model_names=self.model_names)
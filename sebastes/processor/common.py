@@ -1,10 +1,16 @@
 import abc
-import json
+import concurrent.futures
 import typing
 
 import pydantic
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
+
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads  # type: ignore
 
 urllib3.disable_warnings()
 
@@ -77,6 +83,24 @@ class DataManager:
         self._hostname = hostname
         self._username = username
         self._password = password
+        self._base_url = f'https://{hostname}'
+        self._session = requests.Session()
+        # Explicit session auth, otherwise requests would take credentials from ~/.netrc
+        self._session.auth = (username, password)
+        self._session.headers.update({'content-type': 'application/json'})
+        self._session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+    def __enter__(self) -> 'DataManager':
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes HTTP session and all pooled connections
+        """
+        self._session.close()
 
     def link_patch(self,
                    link: Link,
@@ -93,20 +117,11 @@ class DataManager:
         """
         if payload is None:
             payload = {}
-        headers = {'content-type': 'application/json'}
-        base_url = f"https://{self._hostname}"
-        url = f'{base_url}{link.odata_id}'
+        headers: typing.Dict[str, str] = {}
+        url = f'{self._base_url}{link.odata_id}'
 
         if pass_etag is True:
-            get_response = requests.get(
-                url=url,
-                headers=headers,
-                verify=False,
-                auth=(
-                    self._username,
-                    self._password
-                )
-            )
+            get_response = self._session.get(url=url, verify=False)
             if get_response.ok:
                 etag = get_response.headers.get('etag')
                 if etag is not None:
@@ -114,18 +129,14 @@ class DataManager:
             else:
                 raise Exception(get_response.content.decode())
 
-        response = requests.patch(
+        response = self._session.patch(
             url=url,
             headers=headers,
             verify=False,
-            auth=(
-                self._username,
-                self._password
-            ),
-            data=json.dumps(payload)
+            data=json_dumps(payload)
         )
         if response.ok:
-            return response.json()
+            return json_loads(response.content)
         else:
             raise Exception(response.content.decode())
 
@@ -138,22 +149,15 @@ class DataManager:
         """
         if payload is None:
             payload = {}
-        headers = {'content-type': 'application/json'}
-        base_url = f"https://{self._hostname}"
-        url = f'{base_url}{action.target}'
+        url = f'{self._base_url}{action.target}'
 
-        response = requests.post(
+        response = self._session.post(
             url=url,
-            headers=headers,
             verify=False,
-            auth=(
-                self._username,
-                self._password
-            ),
-            data=json.dumps(payload)
+            data=json_dumps(payload)
         )
         if response.ok:
-            return response.json()
+            return json_loads(response.content)
         else:
             raise Exception(response.content.decode())
 
@@ -163,20 +167,10 @@ class DataManager:
         :param url: endpoint URL
         :return: JSON response data
         """
-        headers = {'content-type': 'application/json'}
-        base_url = f"https://{self._hostname}"
-        url = f'{base_url}{url}'
-        response = requests.get(
-            url=url,
-            headers=headers,
-            verify=False,
-            auth=(
-                self._username,
-                self._password
-            )
-        )
+        url = f'{self._base_url}{url}'
+        response = self._session.get(url=url, verify=False)
         if response.ok:
-            return response.json()
+            return json_loads(response.content)
         else:
             raise Exception(response.content.decode())
 
@@ -206,11 +200,11 @@ class DataManager:
         if url is None:
             url = collection.url()
 
-        result = []
         collection_data = self.get_resource(collection, url)
 
-        for member in collection_data.members:
-            member_data = self.get_resource(resource, member.odata_id)
-            result.append(member_data)
+        # Members are independent resources, so they are requested concurrently, map() keeps members order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+            result = list(executor.map(lambda member: self.get_resource(resource, member.odata_id),
+                                       collection_data.members))
 
         return result
@@ -1,29 +1,45 @@
-import dataclasses
+import concurrent.futures
 import os
+import shutil
+import subprocess
+import sys
+import textwrap
 import typing
 
-from datamodel_code_generator.parser.base import Imports, Import
+from datamodel_code_generator.parser.base import Imports
 
 from sebastes.logger import log
-from sebastes.parser import Parser, Result
+from sebastes.parser import Parser, Result, merge_imports
 from sebastes.scanner import RedfishData, RedfishCategory, Problem
 
+_COMMON_SCRIPT = os.path.join(os.path.dirname(__file__), 'common.py')
 
-@dataclasses.dataclass
-class _ProcessedData:
+
+class _ProcessedData(typing.NamedTuple):
     redfish_data: RedfishData
     result: Result
 
 
+def _parse_data(redfish_data: RedfishData, child_data: typing.Optional[RedfishData]) -> Result:
+    # Code is formatted once for all saved modules, see FileProcessor._format_modules
+    return Parser(redfish_data, child_data, format_code=False).results
+
+
 # noinspection PyBroadException
 class FileProcessor:
     """
     File processor class responsible for lib creation
     """
 
-    def __init__(self, redfish_datas: typing.List[RedfishData], base_dir: str):
+    def __init__(self,
+                 redfish_datas: typing.List[RedfishData],
+                 base_dir: str,
+                 format_code: bool = True,
+                 max_workers: typing.Optional[int] = None):
         self._redfish_datas = redfish_datas
         self._base_dir = base_dir
+        self._format_code = format_code
+        self._max_workers = max_workers if max_workers is not None else os.cpu_count()
         self._problems: typing.List[Problem] = []
 
     @property
@@ -51,20 +67,24 @@ class FileProcessor:
 
         log.info(f'Preparing file structure for output in: {self.base_dir}')
 
-        if os.path.isdir(self.model_dir):
-            os.popen(f'rm -fr {self.model_dir}').read()
-        os.mkdir(self.model_dir)
-        common_script = f'{os.path.join(os.path.dirname(__file__))}/common.py'
-        os.popen(f'cp {common_script} {self.model_dir}/common.py')
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+        os.makedirs(self.model_dir, exist_ok=True)
+        shutil.copyfile(_COMMON_SCRIPT, f'{self.model_dir}/common.py')
+
+    def _submit_data(self,
+                     executor: concurrent.futures.Executor,
+                     redfish_data: RedfishData,
+                     child_data: typing.Optional[RedfishData] = None
+                     ) -> concurrent.futures.Future:
+        log.info('Processing: %s', redfish_data)
+        return executor.submit(_parse_data, redfish_data, child_data)
 
     def _process_data(self,
                       redfish_data: RedfishData,
-                      child_data: typing.Optional[RedfishData] = None
+                      future: concurrent.futures.Future
                       ) -> typing.Optional[_ProcessedData]:
-        log.info(f'Processing: {redfish_data}')
         try:
-            parser = Parser(redfish_data, child_data)
-            result = parser.results
+            result = future.result()
             return _ProcessedData(redfish_data=redfish_data, result=result)
         except Exception as error:
             self._problems.append(
@@ -76,10 +96,58 @@ class FileProcessor:
 
     def _save_module(self, data: typing.List[str], imports: Imports, file_name: str) -> None:
         file_name = f'{self.model_dir}/{file_name}.py'
-        total_data = "\n\n".join(data)
-        with open(file_name, 'w') as file:
-            file.write(f'{str(imports)}\n\n\n{total_data}')
-            file.flush()
+        with open(file_name, 'w', buffering=1 << 16) as file:
+            file.write(''.join([str(imports), '\n\n\n', '\n\n'.join(data), '\n']))
+
+    def _save_collection(self,
+                         element_data: RedfishData,
+                         element_future: concurrent.futures.Future,
+                         collection_data: RedfishData,
+                         collection_future: concurrent.futures.Future
+                         ) -> typing.Optional[typing.Tuple[str, typing.List[str]]]:
+        element = self._process_data(element_data, element_future)
+        collection = self._process_data(collection_data, collection_future)
+        if element is None or collection is None:
+            log.warning(f'Skipping Collection processing: {collection_data} - {element_data}')
+            return None
+        imports = merge_imports(element.result.imports, collection.result.imports)
+        file_name = collection.redfish_data.file_name
+        self._save_module([element.result.body, collection.result.body], imports, file_name)
+        return file_name, [collection.redfish_data.full_name, element.redfish_data.full_name]
+
+    def _save_entry(self,
+                    data: RedfishData,
+                    future: concurrent.futures.Future
+                    ) -> typing.Optional[typing.Tuple[str, typing.List[str]]]:
+        entry = self._process_data(data, future)
+        if entry is None:
+            log.warning(f'Skipping Model processing: {data}')
+            return None
+        body = entry.result.body
+        imports = entry.result.imports
+        file_name = entry.redfish_data.file_name
+        self._save_module([body], imports, file_name)
+        return file_name, [entry.redfish_data.full_name]
+
+    def _split_data(self
+                    ) -> typing.Tuple[typing.List[typing.Tuple[RedfishData, RedfishData]], typing.List[RedfishData]]:
+        processed_data: typing.Set[RedfishData] = set()
+        collections: typing.List[typing.Tuple[RedfishData, RedfishData]] = []
+        entries: typing.List[RedfishData] = []
+
+        for data in self._redfish_datas:
+            if data.category == RedfishCategory.ELEMENT:
+                if data not in processed_data and data.parent not in processed_data:
+                    processed_data.add(data)
+                    processed_data.add(data.parent)
+                    collections.append((data, data.parent))
+
+        for data in self._redfish_datas:
+            if data not in processed_data:
+                processed_data.add(data)
+                entries.append(data)
+
+        return collections, entries
 
     def generate_lib(self) -> None:
         """
@@ -89,70 +157,80 @@ class FileProcessor:
 
         log.info('Processing and saving Redfish data.')
 
-        processed_data: typing.List[RedfishData] = []
         init_data: typing.List[typing.Tuple[str, typing.List[str]]] = []
-
-        for data in self._redfish_datas:
-            if data.category == RedfishCategory.ELEMENT:
-                if data not in processed_data and data.parent not in processed_data:
-                    processed_data.append(data)
-                    processed_data.append(data.parent)
-                    element = self._process_data(data)
-                    collection = self._process_data(data.parent, data)
-                    if element is None or collection is None:
-                        log.warning(f'Skipping Collection processing: {data.parent} - {data}')
-                        continue
-                    imports = element.result.imports
-                    for from_, targets in collection.result.imports.items():
-                        for target in targets:
-                            imports.append(Import(from_=from_, import_=target, alias=None))
-                    file_name = collection.redfish_data.file_name
-                    self._save_module([element.result.body, collection.result.body], imports, file_name)
-                    init_data.append((file_name, [collection.redfish_data.full_name, element.redfish_data.full_name]))
-
-        for data in self._redfish_datas:
-            if data not in processed_data:
-                processed_data.append(data)
-                entry = self._process_data(data)
-                if entry is None:
-                    log.warning(f'Skipping Model processing: {data}')
-                    continue
-                body = entry.result.body
-                imports = entry.result.imports
-                file_name = entry.redfish_data.file_name
-                self._save_module([body], imports, file_name)
-                init_data.append((file_name, [entry.redfish_data.full_name]))
+        collections, entries = self._split_data()
+
+        # Parsing is CPU-bound and independent for every model, so it is spread over worker processes
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self._max_workers) as executor:
+            collection_futures = [
+                (self._submit_data(executor, element_data), self._submit_data(executor, collection_data, element_data))
+                for element_data, collection_data in collections
+            ]
+            entry_futures = [self._submit_data(executor, data) for data in entries]
+
+            for (element_data, collection_data), (element_future, collection_future) in zip(
+                    collections, collection_futures
+            ):
+                init_entry = self._save_collection(element_data, element_future, collection_data, collection_future)
+                if init_entry is not None:
+                    init_data.append(init_entry)
+
+            for data, future in zip(entries, entry_futures):
+                init_entry = self._save_entry(data, future)
+                if init_entry is not None:
+                    init_data.append(init_entry)
+
+        if self._format_code and len(init_data) != 0:
+            # Modules black can't format are dropped, so they don't break import of the whole library
+            failed = self._format_modules([file_name for file_name, _ in init_data])
+            init_data = [entry for entry in init_data if entry[0] not in failed]
 
         init_data.append(('common', ['DataManager']))
 
         self._prepare_init_file(init_data)
 
+    def _format_modules(self, file_names: typing.List[str]) -> typing.Set[str]:
+        log.info('Formatting generated code.')
+
+        paths = {file_name: f'{self.model_dir}/{file_name}.py' for file_name in file_names}
+        # Single black run for all modules is much cheaper than formatting each model separately.
+        # Explicit empty config keeps the result independent of pyproject.toml found around output directory.
+        process = subprocess.run(
+            [
+                sys.executable, '-m', 'black', '--quiet', '--config', os.devnull, '--line-length', '88',
+                '--skip-string-normalization', '--target-version', 'py39', *paths.values()
+            ],
+            capture_output=True,
+            text=True
+        )
+        if process.returncode == 0:
+            return set()
+
+        # Black reports every module it failed to format with its path
+        failed = {file_name for file_name, path in paths.items() if f'{path}:' in process.stderr}
+        if len(failed) == 0:
+            self._problems.append(Problem(url=self.model_dir, description=f'Unable format code: \n {process.stderr}'))
+        for file_name in sorted(failed):
+            error = '\n'.join(line for line in process.stderr.splitlines() if f'{paths[file_name]}:' in line)
+            self._problems.append(
+                Problem(url=paths[file_name], description=f'Unable format code, module skipped: \n {error}')
+            )
+            os.remove(paths[file_name])
+        return failed
+
     def _prepare_init_file(self, data: typing.List[typing.Tuple[str, typing.List[str]]]) -> None:
         log.info('Preparing init file.')
 
         data.sort()
-        result = '__all__ = [\n'
-        classes: typing.List[str] = []
-
-        for _, classes_ in data:
-            classes += classes_
-
-        line = '\t'
-        for c in classes:
-            if (len(line) + len(c)) > 120:
-                result += f'{line}\n'
-                line = '\t'
-            else:
-                line += f'"{c}", '
-
-        if line != '\t':
-            result += f'{line}\n'
-        result += ']\n\n'
+        classes = ', '.join(f'"{c}"' for _, classes_ in data for c in classes_)
+        body = textwrap.fill(f'{classes},', width=120, initial_indent='\t', subsequent_indent='\t',
+                             break_long_words=False, break_on_hyphens=False)
+        parts: typing.List[str] = [f'__all__ = [\n{body}\n]\n\n']
 
         for file, classes_ in data:
-            result += f'from .{file} import {", ".join(classes_)}\n'
+            parts.append(f'from .{file} import {", ".join(classes_)}\n')
 
         file_name = f'{self.model_dir}/__init__.py'
 
-        with open(file_name, 'w') as f:
-            f.write(result)
+        with open(file_name, 'w', buffering=1 << 20) as f:
+            f.write(''.join(parts))
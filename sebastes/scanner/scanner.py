@@ -1,6 +1,9 @@
+import collections
+import concurrent.futures
 import dataclasses
 import enum
 import functools
+import itertools
 import json
 import random
 import re
@@ -9,11 +12,16 @@ import typing
 import genson
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
 
 from sebastes.logger import log
 
 urllib3.disable_warnings()
 
+_first_cap_pattern = re.compile('(.)([A-Z][a-z]+)')
+_double_underscore_pattern = re.compile('__([A-Z])')
+_all_cap_pattern = re.compile('([a-z0-9])([A-Z])')
+
 
 class RedfishCategory(enum.Enum):
     """
@@ -46,6 +54,7 @@ class RedfishData:
 
     def __init__(self, name: str, data: dict, uri: str, parent: typing.Optional['RedfishData']):
         self._name = name
+        self._name_lower = name.lower()
         self._data = data
         self._uri = uri
         self._parent = parent
@@ -64,21 +73,21 @@ class RedfishData:
         """
         return self._data
 
-    @property
+    @functools.cached_property
     def schema(self) -> str:
         """
         Data's JSON schema
         """
         builder = genson.SchemaBuilder()
         builder.add_object(self.data)
-        return json.dumps(builder.to_schema())
+        return json.dumps(builder.to_schema(), separators=(',', ':'))
 
-    @property
+    @functools.cached_property
     def category(self) -> RedfishCategory:
         """
         Redfish model Category
         """
-        if 'collection' in self._name.lower():
+        if 'collection' in self._name_lower:
             return RedfishCategory.COLLECTION
         elif self.parent is not None and \
                 self.parent.category == RedfishCategory.COLLECTION and \
@@ -101,7 +110,7 @@ class RedfishData:
         """
         return self._name
 
-    @property
+    @functools.cached_property
     def full_name(self) -> str:
         """
         Model full name, created from own and parents names
@@ -116,9 +125,9 @@ class RedfishData:
         """
         Snake case form of model name, for files
         """
-        file_name = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', self.full_name)
-        file_name = re.sub('__([A-Z])', r'_\1', file_name)
-        file_name = re.sub('([a-z0-9])([A-Z])', r'\1_\2', file_name)
+        file_name = _first_cap_pattern.sub(r'\1_\2', self.full_name)
+        file_name = _double_underscore_pattern.sub(r'_\1', file_name)
+        file_name = _all_cap_pattern.sub(r'\1_\2', file_name)
         return file_name.lower()
 
     @functools.cached_property
@@ -160,6 +169,9 @@ class RedfishData:
         else:
             return False
 
+    def __hash__(self) -> int:
+        return hash(self.full_name)
+
 
 # noinspection PyBroadException
 class Scanner:
@@ -167,14 +179,26 @@ class Scanner:
     Redfish scanner nuff said
     """
 
-    def __init__(self, hostname: str, username: str, password: str, max_models: int = 1000, max_collection: int = 50):
+    def __init__(self,
+                 hostname: str,
+                 username: str,
+                 password: str,
+                 max_models: int = 1000,
+                 max_collection: int = 50,
+                 max_workers: int = 4):
         self._hostname = hostname
         self._username = username
         self._password = password
         self._max_models = max_models
         self._max_collection = max_collection
+        self._max_workers = max_workers
+        self._session = requests.Session()
+        self._session.auth = (username, password)
+        self._session.headers.update({'content-type': 'application/json'})
+        self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
         self._redfish: typing.List[RedfishData] = []
-        self._scanned_uris: typing.List[str] = []
+        self._redfish_set: typing.Set[RedfishData] = set()
+        self._scanned_uris: typing.Set[str] = set()
         self._problems: typing.List[Problem] = []
 
     @property
@@ -195,7 +219,7 @@ class Scanner:
     def _get_model_name(data: dict) -> typing.Optional[str]:
         odata_type = data.get('@odata.type', None)
         if odata_type is not None:
-            value = odata_type.split('.')[-1]
+            _, _, value = odata_type.rpartition('.')
             value = value.replace('collection', 'Collection')
             value = value.replace('entry', 'Entry')
             value = value[0].upper() + value[1:]
@@ -203,66 +227,97 @@ class Scanner:
 
     def _get_uris(self, data: dict) -> typing.List[str]:
         result: typing.List[str] = []
-        for key, value in data.items():
-            if key == '@odata.id' and value not in result:
-                result.append(value)
-            if key == 'Members':
-                if len(data['Members']) > self._max_collection:
-                    for _entry in random.sample(data['Members'], self._max_collection):
-                        result += self._get_uris(_entry)
-                else:
-                    for _entry in data['Members']:
-                        result += self._get_uris(_entry)
-            if isinstance(value, dict):
-                result += self._get_uris(value)
+        found: typing.Set[str] = set()
+        # Nested dicts are walked with explicit stack of iterators, URIs keep their order of appearance
+        stack: typing.List[typing.Iterator[typing.Tuple[str, typing.Any]]] = [iter(data.items())]
+        while len(stack) != 0:
+            for key, value in stack[-1]:
+                if key == '@odata.id' and value not in found:
+                    found.add(value)
+                    # Schema files are not Redfish resources, they never get to the work list
+                    if 'jsonschemas' not in value.lower():
+                        result.append(value)
+                if key == 'Members':
+                    members = value
+                    if len(members) > self._max_collection:
+                        members = random.sample(members, self._max_collection)
+                    stack.append(itertools.chain.from_iterable(member.items() for member in members))
+                    break
+                if isinstance(value, dict):
+                    stack.append(iter(value.items()))
+                    break
+            else:
+                stack.pop()
         return result
 
     def _get_json(self, url: str) -> dict:
-        headers = {'content-type': 'application/json'}
         base_url = f"https://{self._hostname}"
         url = f'{base_url}{url}'
-        response = requests.get(
-            url=url,
-            headers=headers,
-            verify=False,
-            auth=(
-                self._username,
-                self._password
-            )
-        )
+        # Session-level verify is overridden by REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE, so it is passed per request
+        response = self._session.get(url=url, verify=False)
         if response.ok:
             return response.json()
         else:
             raise Exception(response.content.decode())
 
+    def _submit_scans(self,
+                      executor: concurrent.futures.Executor,
+                      work: typing.Deque[typing.Tuple[str, typing.Optional[RedfishData]]],
+                      scans: typing.Deque[typing.Tuple[concurrent.futures.Future, str, typing.Optional[RedfishData]]]
+                      ) -> None:
+        # Only max_workers requests are in flight, the rest of URIs wait in the work list
+        while len(work) != 0 and len(scans) < self._max_workers:
+            entry_point, parent = work.popleft()
+            if parent is not None:
+                log.info('[%d] Scanning: %s parent is %s', len(self._redfish), entry_point, parent)
+            else:
+                log.info('[%d] Scanning: %s', len(self._redfish), entry_point)
+            scans.append((executor.submit(self._get_json, entry_point), entry_point, parent))
+
+    def _process_scan(self,
+                      future: concurrent.futures.Future,
+                      entry_point: str,
+                      parent: typing.Optional[RedfishData],
+                      work: typing.Deque[typing.Tuple[str, typing.Optional[RedfishData]]]) -> None:
+        model: typing.Optional[RedfishData] = None
+        try:
+            data = future.result()
+            name = self._get_model_name(data)
+
+            if (parent is None or parent.name != name) and name is not None:
+                model = RedfishData(name=name, data=data, uri=entry_point, parent=parent)
+                if model not in self._redfish_set and len(self._redfish) < self._max_models:
+                    self._redfish.append(model)
+                    self._redfish_set.add(model)
+
+            # URIs are marked when queued, so the work list never holds duplicates.
+            # Responses are processed in the calling thread only, no lock is needed.
+            for uri in self._get_uris(data):
+                if uri not in self._scanned_uris:
+                    self._scanned_uris.add(uri)
+                    work.append((uri, model))
+        except Exception as error:
+            self._problems.append(Problem(url=entry_point, description=str(error)))
+
     def scan_models(self, entry_point: str = "/redfish/v1/", parent: typing.Optional[RedfishData] = None) -> None:
         """
         Scan target endpoint and all it's children.
+        Requests are sent by a pool of threads, responses are processed in the calling thread.
         :param entry_point: scan start point
         :param parent: possible scan parent RedfishData
         """
-        if len(self._redfish) < self._max_models:
-            if entry_point not in self._scanned_uris and 'jsonschemas' not in entry_point.lower():
-                self._scanned_uris.append(entry_point)
-                model: typing.Optional[RedfishData] = None
-                if parent is not None:
-                    log.info(f'[{len(self._redfish)}] Scanning: {entry_point} parent is {parent}')
-                else:
-                    log.info(f'[{len(self._redfish)}] Scanning: {entry_point}')
-
-                try:
-                    data = self._get_json(entry_point)
-                    name = self._get_model_name(data)
-
-                    if (parent is None or parent.name != name) and name is not None:
-                        model = RedfishData(name=name, data=data, uri=entry_point, parent=parent)
-                        if model not in self._redfish:
-                            self._redfish.append(model)
-
-                    for uri in self._get_uris(data):
-                        if uri not in self._scanned_uris:
-                            self.scan_models(entry_point=uri, parent=model)
-                except Exception as error:
-                    self._problems.append(Problem(url=entry_point, description=str(error)))
-        else:
-            log.info(f'Models limit was reached - {self._max_models}')
+        if entry_point in self._scanned_uris:
+            return
+        self._scanned_uris.add(entry_point)
+        work: typing.Deque[typing.Tuple[str, typing.Optional[RedfishData]]] = collections.deque([(entry_point, parent)])
+        scans: typing.Deque[typing.Tuple[concurrent.futures.Future, str, typing.Optional[RedfishData]]] = \
+            collections.deque()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while len(work) != 0 or len(scans) != 0:
+                if len(self._redfish) >= self._max_models:
+                    log.info(f'Models limit was reached - {self._max_models}')
+                    break
+                self._submit_scans(executor, work, scans)
+                # Responses are processed in submission order, so the scan result doesn't depend on timings
+                future, uri, uri_parent = scans.popleft()
+                self._process_scan(future, uri, uri_parent, work)